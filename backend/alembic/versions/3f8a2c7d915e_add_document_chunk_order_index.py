@@ -0,0 +1,30 @@
+"""Add index for ordered chunk reads per document
+
+Revision ID: 3f8a2c7d915e
+Revises: 9d6c0a4e2f13
+Create Date: 2026-10-15 16:42:55.190347
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8a2c7d915e'
+down_revision: Union[str, None] = '9d6c0a4e2f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_document_chunks_document_index',
+        'document_chunks',
+        ['document_id', 'chunk_index'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_document_chunks_document_index', table_name='document_chunks')
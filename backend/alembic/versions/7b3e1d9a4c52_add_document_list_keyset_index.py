@@ -0,0 +1,31 @@
+"""Add keyset pagination index on documents
+
+Revision ID: 7b3e1d9a4c52
+Revises: 02ca2d204e70
+Create Date: 2026-10-15 10:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3e1d9a4c52'
+down_revision: Union[str, None] = '02ca2d204e70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_documents_priority_created_id',
+        'documents',
+        [sa.text('priority DESC'), sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_priority_created_id', table_name='documents')
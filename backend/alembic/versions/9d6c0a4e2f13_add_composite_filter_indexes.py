@@ -0,0 +1,45 @@
+"""Add composite indexes for document, task and review filters
+
+Revision ID: 9d6c0a4e2f13
+Revises: e5d19b3f7a28
+Create Date: 2026-10-15 15:21:08.374519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d6c0a4e2f13'
+down_revision: Union[str, None] = 'e5d19b3f7a28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_documents_status_step_priority_created',
+        'documents',
+        ['status', 'current_step', sa.text('priority DESC'), sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+    op.create_index(
+        'ix_pipeline_tasks_document_step',
+        'pipeline_tasks',
+        ['document_id', 'step'],
+        unique=False
+    )
+    op.create_index(
+        'ix_qa_reviews_document_created',
+        'qa_reviews',
+        ['document_id', sa.text('created_at DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_qa_reviews_document_created', table_name='qa_reviews')
+    op.drop_index('ix_pipeline_tasks_document_step', table_name='pipeline_tasks')
+    op.drop_index('ix_documents_status_step_priority_created', table_name='documents')
@@ -0,0 +1,31 @@
+"""Add per-user task dashboard index on pipeline_tasks
+
+Revision ID: c4a8f2e61b07
+Revises: 7b3e1d9a4c52
+Create Date: 2026-10-15 10:41:07.218934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a8f2e61b07'
+down_revision: Union[str, None] = '7b3e1d9a4c52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_pipeline_tasks_user_status_completed',
+        'pipeline_tasks',
+        ['assigned_to_id', 'status', sa.text('completed_at DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pipeline_tasks_user_status_completed', table_name='pipeline_tasks')
@@ -0,0 +1,52 @@
+"""Use server-side defaults for pipeline timestamps
+
+Revision ID: e5d19b3f7a28
+Revises: c4a8f2e61b07
+Create Date: 2026-10-15 14:03:27.861492
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5d19b3f7a28'
+down_revision: Union[str, None] = 'c4a8f2e61b07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Timestamp columns filled in by the database when a row is inserted
+TIMESTAMP_COLUMNS = [
+    ('documents', 'created_at'),
+    ('documents', 'updated_at'),
+    ('extracted_texts', 'created_at'),
+    ('extracted_texts', 'updated_at'),
+    ('document_chunks', 'created_at'),
+    ('document_chunks', 'updated_at'),
+    ('pipeline_tasks', 'created_at'),
+    ('pipeline_tasks', 'updated_at'),
+    ('qa_reviews', 'created_at'),
+    ('document_metadata', 'created_at'),
+    ('document_metadata', 'updated_at'),
+    ('published_documents', 'published_at'),
+    ('published_documents', 'created_at'),
+    ('published_documents', 'updated_at'),
+]
+
+
+def upgrade() -> None:
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            existing_type=sa.DateTime(),
+            server_default=sa.text("timezone('utc', now())")
+        )
+
+
+def downgrade() -> None:
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(table, column, existing_type=sa.DateTime(), server_default=None)
@@ -40,7 +40,7 @@ async def chat(
             history = [{"role": msg.role, "content": msg.content} for msg in request.history]
         
         # Generate response
-        response_text = llm.chat(
+        response_text = await llm.chat(
             message=request.message,
             history=history,
             persona=request.persona or "legal_assistant"
@@ -70,7 +70,7 @@ async def quick_action(
         prompt = QUICK_ACTIONS.get(request.action, request.action)
         
         # Generate response
-        response_text = llm.generate(prompt=prompt)
+        response_text = await llm.generate(prompt=prompt)
         
         return ChatResponse(response=response_text, success=True)
     
@@ -3,9 +3,14 @@ Pipeline API Routes - Document processing pipeline endpoints
 """
 import os
 import uuid
+import asyncio
 import shutil
+import base64
+import orjson
+import aiofiles
+import aiofiles.os
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
 from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -14,16 +19,16 @@ from app.core.database import get_db
 from app.core.dependencies import get_current_user, require_internal_team
 from app.models.user import User
 from app.models.document_pipeline import PipelineStep, DocumentStatus, TaskStatus
-from app.services.pipeline_service import PipelineService
+from app.services.pipeline_service import PipelineService, NEXT_PIPELINE_STEP
 from app.services.extraction_service import ExtractionService
-from app.utils.helpers import calculate_file_hash_from_upload
+from app.utils.helpers import calculate_content_hash_from_stream, ensure_dir
 from app.schemas.pipeline import (
     DocumentCreate, DocumentUpdate, DocumentResponse, DocumentListResponse,
     ExtractedTextCreate, ExtractedTextUpdate, ExtractedTextResponse,
     ChunksCreate, ChunkUpdate, ChunkResponse,
     DocumentMetadataCreate, DocumentMetadataUpdate, DocumentMetadataResponse,
     SummarizationCreate, SummarizationResponse,
-    TaskAssign, TaskUpdate, TaskComplete, TaskRevision, PipelineTaskResponse, MyTasksResponse,
+    TaskAssign, TaskBulkAssign, TaskUpdate, TaskComplete, TaskRevision, PipelineTaskResponse, MyTasksResponse,
     QAReviewCreate, QAReviewResponse,
     PublishRequest, PublishedDocumentResponse,
     PipelineStats, PipelineStepEnum, DocumentStatusEnum, TaskStatusEnum
@@ -35,6 +40,23 @@ router = APIRouter(prefix="/pipeline", tags=["Document Pipeline"])
 # Allowed file types
 ALLOWED_EXTENSIONS = {".pdf", ".docx", ".doc", ".txt", ".rtf", ".odt"}
 UPLOAD_DIR = "uploads/documents"
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # Bytes copied per read when saving an upload
+
+
+def _encode_cursor(cursor: Tuple[int, datetime, int]) -> str:
+    """Encode a (priority, created_at, id) keyset cursor as an opaque string"""
+    priority, created_at, document_id = cursor
+    raw = orjson.dumps([priority, created_at.isoformat(), document_id])
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[int, datetime, int]:
+    """Decode a cursor produced by _encode_cursor"""
+    try:
+        priority, created_at, document_id = orjson.loads(base64.urlsafe_b64decode(cursor))
+        return int(priority), datetime.fromisoformat(created_at), int(document_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 
 # ========== Document Upload & Management ==========
@@ -58,9 +80,9 @@ async def upload_document(
             detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
         )
     
-    # Read file data and calculate hash for duplicate detection
-    file_data = await file.read()
-    file_hash = calculate_file_hash_from_upload(file_data)
+    # Hash the spooled upload for duplicate detection without reading it all into memory
+    file_hash = await asyncio.to_thread(calculate_content_hash_from_stream, file.file)
+    await file.seek(0)
     
     # Check for duplicates
     service = PipelineService(db)
@@ -83,7 +105,7 @@ async def upload_document(
         )
     
     # Create upload directory if not exists
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    ensure_dir(UPLOAD_DIR)
     
     # Generate unique filename
     unique_filename = f"{uuid.uuid4()}{file_ext}"
@@ -91,9 +113,11 @@ async def upload_document(
     
     # Save file
     try:
-        with open(file_path, "wb") as buffer:
-            buffer.write(file_data)
-        file_size = len(file_data)
+        file_size = 0
+        async with aiofiles.open(file_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await buffer.write(chunk)
+                file_size += len(chunk)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
     
@@ -122,8 +146,7 @@ async def check_duplicate(
 ):
     """Check if a document is a duplicate without uploading"""
     # Calculate file hash
-    file_data = await file.read()
-    file_hash = calculate_file_hash_from_upload(file_data)
+    file_hash = await asyncio.to_thread(calculate_content_hash_from_stream, file.file)
     
     # Check for duplicates
     service = PipelineService(db)
@@ -151,34 +174,40 @@ async def list_documents(
     status: Optional[DocumentStatusEnum] = None,
     step: Optional[PipelineStepEnum] = None,
     category: Optional[str] = None,
-    page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     page_size: int = Query(20, ge=1, le=100),
+    include_total: bool = Query(False, description="Also return the total matching count"),
+    estimate_total: bool = Query(False, description="Return a fast planner estimate as the total"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_internal_team)
 ):
-    """List all documents with optional filters"""
+    """List documents with optional filters, newest/highest priority first"""
     service = PipelineService(db)
     
     # Convert enum strings to actual enums if provided
     db_status = DocumentStatus(status.value) if status else None
     db_step = PipelineStep(step.value) if step else None
     
-    documents, total = await service.get_documents(
+    documents, next_cursor, total = await service.get_documents(
         status=db_status,
         step=db_step,
         category=category,
-        page=page,
-        page_size=page_size
+        cursor=_decode_cursor(cursor) if cursor else None,
+        page_size=page_size,
+        include_total=include_total and not estimate_total
     )
-    
-    total_pages = (total + page_size - 1) // page_size
+    if estimate_total:
+        total = await service.estimate_documents_count(
+            status=db_status,
+            step=db_step,
+            category=category
+        )
     
     return DocumentListResponse(
         documents=documents,
-        total=total,
-        page=page,
         page_size=page_size,
-        total_pages=total_pages
+        next_cursor=_encode_cursor(next_cursor) if next_cursor else None,
+        total=total
     )
 
 
@@ -190,7 +219,7 @@ async def get_document(
 ):
     """Get document details"""
     service = PipelineService(db)
-    document = await service.get_document(document_id)
+    document = await service.get_document(document_id, include=())
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     return document
@@ -220,11 +249,11 @@ async def get_document_file(
         raise HTTPException(status_code=401, detail="Invalid token")
 
     service = PipelineService(db)
-    document = await service.get_document(document_id)
+    document = await service.get_document_basic(document_id)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    if not os.path.exists(document.file_path):
+    if not await aiofiles.os.path.exists(document.file_path):
         raise HTTPException(status_code=404, detail="File not found on disk")
 
     # Map file types to MIME types
@@ -265,21 +294,11 @@ async def advance_document_step(
 ):
     """Advance document to next step in pipeline and create task"""
     service = PipelineService(db)
-    document = await service.get_document(document_id)
+    document = await service.get_document_basic(document_id)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    # Map current step to next step
-    step_progression = {
-        PipelineStep.UPLOAD: PipelineStep.TEXT_EXTRACTION,
-        PipelineStep.TEXT_EXTRACTION: PipelineStep.CHUNKING,
-        PipelineStep.CHUNKING: PipelineStep.METADATA,
-        PipelineStep.METADATA: PipelineStep.SUMMARIZATION,
-        PipelineStep.SUMMARIZATION: PipelineStep.QUALITY_ASSURANCE,
-        PipelineStep.QUALITY_ASSURANCE: PipelineStep.PUBLISH,
-    }
-    
-    next_step = step_progression.get(document.current_step)
+    next_step = NEXT_PIPELINE_STEP.get(document.current_step)
     if not next_step:
         raise HTTPException(status_code=400, detail="Document is already at final step or cannot advance")
     
@@ -345,7 +364,7 @@ async def save_extracted_text(
     service = PipelineService(db)
     
     # Verify document exists
-    document = await service.get_document(document_id)
+    document = await service.get_document_basic(document_id)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
@@ -355,16 +374,10 @@ async def save_extracted_text(
         cleaned_text=data.cleaned_text,
         extraction_method=data.extraction_method,
         confidence_score=data.confidence_score,
-        processed_by_id=current_user.id
+        processed_by_id=current_user.id,
+        complete_task=True  # Complete the user's extraction task in the same commit
     )
     
-    # Complete the task
-    tasks = await service.get_user_tasks(current_user.id)
-    for task in tasks.get("in_progress", []):
-        if task.document_id == document_id and task.step == PipelineStep.TEXT_EXTRACTION:
-            await service.complete_task(task.id, current_user.id)
-            break
-    
     return extracted
 
 
@@ -392,11 +405,11 @@ async def extract_text_from_document(
     """Extract raw text from document using Docling.
     Returns the extracted raw text without saving to DB."""
     service = PipelineService(db)
-    document = await service.get_document(document_id)
+    document = await service.get_document_basic(document_id)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    if not os.path.exists(document.file_path):
+    if not await aiofiles.os.path.exists(document.file_path):
         raise HTTPException(status_code=404, detail="Document file not found on disk")
 
     try:
@@ -426,7 +439,7 @@ async def save_extraction_draft(
     service = PipelineService(db)
     
     # Verify document exists
-    document = await service.get_document(document_id)
+    document = await service.get_document_basic(document_id)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
@@ -475,7 +488,7 @@ async def save_chunks(
     """Save chunks for a document"""
     service = PipelineService(db)
     
-    document = await service.get_document(document_id)
+    document = await service.get_document_basic(document_id)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
@@ -491,12 +504,14 @@ async def save_chunks(
 @router.get("/documents/{document_id}/chunks", response_model=List[ChunkResponse])
 async def get_chunks(
     document_id: int,
+    after_index: Optional[int] = Query(None, description="Return chunks after this chunk_index"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Max chunks to return (default: all)"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_internal_team)
 ):
-    """Get all chunks for a document"""
+    """Get chunks for a document (pass the last chunk_index as after_index for the next page)"""
     service = PipelineService(db)
-    chunks = await service.get_chunks(document_id)
+    chunks = await service.get_chunks(document_id, after_index=after_index, limit=limit)
     return chunks
 
 
@@ -527,7 +542,7 @@ async def save_metadata(
     """Save metadata for a document"""
     service = PipelineService(db)
     
-    document = await service.get_document(document_id)
+    document = await service.get_document_basic(document_id)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
@@ -566,7 +581,7 @@ async def save_summary(
     """Save summary for a document"""
     service = PipelineService(db)
     
-    document = await service.get_document(document_id)
+    document = await service.get_document_basic(document_id)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
@@ -597,7 +612,7 @@ async def create_qa_review(
     """Create a QA review for a document"""
     service = PipelineService(db)
     
-    document = await service.get_document(document_id)
+    document = await service.get_document_basic(document_id)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
@@ -634,7 +649,7 @@ async def publish_document(
     """Publish a document to the legal database"""
     service = PipelineService(db)
     
-    document = await service.get_document(document_id)
+    document = await service.get_document_basic(document_id)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
@@ -711,6 +726,22 @@ async def assign_task(
     return updated_task
 
 
+@router.post("/tasks/assign-bulk", response_model=List[PipelineTaskResponse])
+async def assign_tasks_bulk(
+    data: TaskBulkAssign,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_internal_team)
+):
+    """Assign several tasks to a user at once"""
+    service = PipelineService(db)
+    tasks = await service.assign_tasks_bulk(
+        task_ids=data.task_ids,
+        assigned_to_id=data.assigned_to_id,
+        assigned_by_id=current_user.id
+    )
+    return tasks
+
+
 @router.post("/tasks/{task_id}/pickup", response_model=PipelineTaskResponse)
 async def pickup_task(
     task_id: int,
@@ -0,0 +1,124 @@
+"""
+Cache - Short-lived caching of computed JSON values
+Uses Redis when REDIS_URL is set (shared by all workers),
+otherwise a per-process in-memory cache
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+import orjson
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# How long a worker may hold a recompute lock before others stop waiting (ms)
+LOCK_TIMEOUT_MS = 5000
+LOCK_POLL_INTERVAL = 0.05
+
+_redis = None
+_local_cache: Dict[str, Tuple[float, Any]] = {}
+_local_locks: Dict[str, asyncio.Lock] = {}
+
+
+def get_redis():
+    """Get the shared Redis client, or None when REDIS_URL is not configured"""
+    global _redis
+    if _redis is None and settings.REDIS_URL:
+        from redis import asyncio as aioredis
+        _redis = aioredis.from_url(settings.REDIS_URL)
+    return _redis
+
+
+async def close_cache():
+    """Close the Redis connection pool (called during application shutdown)"""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+async def get_or_compute(
+    key: str,
+    ttl: int,
+    compute: Callable[[], Awaitable[Any]]
+) -> Any:
+    """
+    Return the cached value for key, or compute and cache it for ttl seconds
+
+    Only one caller recomputes an expired entry; concurrent callers wait
+    for its result instead of all running the computation at once.
+    The value must be JSON serializable.
+    """
+    redis = get_redis()
+    if redis is None:
+        return await _get_or_compute_local(key, ttl, compute)
+    return await _get_or_compute_redis(redis, key, ttl, compute)
+
+
+async def _get_or_compute_local(key: str, ttl: int, compute: Callable[[], Awaitable[Any]]) -> Any:
+    """In-process cache with a per-key lock against concurrent recomputation"""
+    entry = _local_cache.get(key)
+    if entry is not None:
+        if entry[0] > time.monotonic():
+            return entry[1]
+        _local_cache.pop(key, None)
+
+    lock = _local_locks.get(key)
+    if lock is None:
+        lock = _local_locks[key] = asyncio.Lock()
+    async with lock:
+        # Another request may have refreshed the entry while we waited
+        entry = _local_cache.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        try:
+            value = await compute()
+            _local_cache[key] = (time.monotonic() + ttl, value)
+            return value
+        finally:
+            # The lock is only needed while the value is being recomputed;
+            # callers queued on it re-check the fresh entry above
+            if _local_locks.get(key) is lock:
+                del _local_locks[key]
+
+
+async def _get_or_compute_redis(redis, key: str, ttl: int, compute: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Redis cache with a SET NX PX lock so one worker recomputes per expiry
+    Falls back to computing directly if Redis is unreachable
+    """
+    from redis.exceptions import RedisError
+
+    lock_key = f"{key}:lock"
+    try:
+        cached = await redis.get(key)
+        if cached is not None:
+            return orjson.loads(cached)
+
+        if not await redis.set(lock_key, b"1", nx=True, px=LOCK_TIMEOUT_MS):
+            # Another worker is recomputing - wait for its result
+            deadline = time.monotonic() + LOCK_TIMEOUT_MS / 1000
+            while time.monotonic() < deadline:
+                await asyncio.sleep(LOCK_POLL_INTERVAL)
+                cached = await redis.get(key)
+                if cached is not None:
+                    return orjson.loads(cached)
+            return await compute()
+    except RedisError as e:
+        logger.warning("Cache unavailable for %s: %s", key, e)
+        return await compute()
+
+    try:
+        value = await compute()
+        await redis.setex(key, ttl, orjson.dumps(value))
+        return value
+    except RedisError as e:
+        logger.warning("Could not cache %s: %s", key, e)
+        return value
+    finally:
+        try:
+            await redis.delete(lock_key)
+        except RedisError:
+            pass  # Lock expires on its own after LOCK_TIMEOUT_MS
@@ -2,8 +2,10 @@
 Application Configuration
 All settings are loaded from environment variables with sensible defaults
 """
+from pydantic import Field
 from pydantic_settings import BaseSettings
-from typing import Optional
+from functools import cached_property
+from typing import Literal, Optional
 from pathlib import Path
 import os
 
@@ -44,9 +46,10 @@ class Settings(BaseSettings):
     DATABASE_ECHO: bool = False  # Set to True for SQL query logging
     
     # ===================
-    # Redis (for future use - caching, sessions)
+    # Redis (caching; falls back to an in-process cache when unset)
     # ===================
     REDIS_URL: Optional[str] = None
+    PIPELINE_STATS_CACHE_TTL: int = 10  # seconds the dashboard stats are reused
     
     # ===================
     # JWT Authentication
@@ -59,12 +62,16 @@ class Settings(BaseSettings):
     OLLAMA_URL: str = "http://localhost:11434"
     OLLAMA_MODEL: str = "gemma3:1b"
     OLLAMA_TIMEOUT: int = 60  # seconds
+    OLLAMA_KEEP_ALIVE: str = "30m"  # How long Ollama keeps the model loaded after a request
+    OLLAMA_RETRY_ATTEMPTS: int = Field(default=3, ge=1)  # Connection attempts per request before giving up
+    OLLAMA_RECHECK_INTERVAL: int = 10  # seconds between re-probes while Ollama is down
     
     # ===================
     # LLM Settings
     # ===================
     LLM_MAX_TOKENS: int = 150
     LLM_TEMPERATURE: float = 0.7
+    LLM_CONTEXT_TOKENS: int = 2048  # Context window requested from Ollama (num_ctx)
     
     # ===================
     # File Upload (for OCR, documents)
@@ -72,6 +79,9 @@ class Settings(BaseSettings):
     UPLOAD_DIR: str = "./uploads"
     MAX_UPLOAD_SIZE: int = 104857600  # 100MB
     ALLOWED_EXTENSIONS: str = "pdf,png,jpg,jpeg,doc,docx"
+    # Fingerprint for duplicate detection: sha256 or blake3 (pip install blake3).
+    # Changing it means existing documents' hashes no longer match new uploads.
+    CONTENT_HASH_ALGO: Literal["sha256", "blake3"] = "sha256"
     
     # ===================
     # Security (for future auth)
@@ -90,6 +100,11 @@ class Settings(BaseSettings):
         """Convert comma-separated extensions to list"""
         return [ext.strip().lower() for ext in self.ALLOWED_EXTENSIONS.split(",")]
     
+    @cached_property
+    def allowed_extensions_set(self) -> frozenset:
+        """Allowed extensions (without the dot) as a frozenset, built once"""
+        return frozenset(ext.lstrip(".") for ext in self.allowed_extensions_list)
+    
     class Config:
         env_file = str(ENV_FILE)
         case_sensitive = True
@@ -13,6 +13,7 @@ engine = create_async_engine(
     future=True,
     pool_size=5,
     max_overflow=10,
+    insertmanyvalues_page_size=1000,  # Rows per batch for bulk INSERT ... RETURNING
 )
 
 # Create async session factory
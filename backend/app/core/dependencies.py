@@ -3,7 +3,7 @@ FastAPI Dependencies
 Reusable dependencies for route handlers
 """
 from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError, jwt
@@ -17,12 +17,12 @@ from app.models.user import User, UserRole
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
 
 
-def get_llm_service() -> LLMService:
+def get_llm_service(request: Request) -> LLMService:
     """
-    Get LLM service instance (singleton)
+    Get LLM service instance (created in app lifespan)
     Usage: llm = Depends(get_llm_service)
     """
-    return LLMService.get_instance()
+    return request.app.state.llm
 
 
 async def get_current_user(
@@ -10,8 +10,9 @@ from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.api.v1 import router as api_v1_router
-from app.services.llm_service import get_llm_service
+from app.services.llm_service import LLMService
 from app.core.database import init_db, close_db, AsyncSessionLocal
+from app.core.cache import close_cache
 from app.services.auth_service import auth_service
 
 
@@ -40,7 +41,8 @@ async def lifespan(app: FastAPI):
         print("   (App will continue, but auth features may not work)")
     
     # Initialize LLM service (checks Ollama connection)
-    llm = get_llm_service()
+    app.state.llm = LLMService()
+    await app.state.llm.aconnect()
     
     print(f"✅ {settings.APP_NAME} is ready!")
     print(f"📚 API Docs: http://localhost:8000/docs")
@@ -49,6 +51,8 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     print(f"👋 Shutting down {settings.APP_NAME}...")
+    await app.state.llm.aclose()
+    await close_cache()
     await close_db()
 
 
@@ -121,7 +125,7 @@ async def root():
 @app.get("/health")
 async def health():
     """Simple health check"""
-    llm = get_llm_service()
+    llm = app.state.llm
     return {
         "status": "healthy" if llm.is_available else "degraded",
         "version": settings.APP_VERSION,
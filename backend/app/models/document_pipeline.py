@@ -4,14 +4,21 @@ Supports 7-step workflow: Upload -> TextExtraction -> Chunking -> Metadata -> Su
 Designed for multi-user collaboration with task assignment
 """
 import enum
-from datetime import datetime
 from sqlalchemy import (
-    Column, Integer, String, Boolean, DateTime, Enum, Text, ForeignKey, JSON, Float
+    Column, Integer, String, Boolean, DateTime, Enum, Text, ForeignKey, JSON, Float, Index, func
 )
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 
+def utc_now():
+    """
+    Current UTC time as computed by the database (naive, like the DateTime columns)
+    now() is fixed for the transaction, so every timestamp written together matches
+    """
+    return func.timezone("utc", func.now())
+
+
 class DocumentStatus(str, enum.Enum):
     """Overall document status in the pipeline"""
     UPLOADED = "uploaded"
@@ -81,8 +88,8 @@ class Document(Base):
     priority = Column(Integer, default=5)  # 1-10, 10 being highest
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utc_now())
+    updated_at = Column(DateTime, server_default=utc_now(), onupdate=utc_now())
     published_at = Column(DateTime, nullable=True)
     
     # Relationships
@@ -90,10 +97,20 @@ class Document(Base):
     uploaded_by = relationship("User", foreign_keys=[uploaded_by_id])
     
     # Related entities
-    extracted_text = relationship("ExtractedText", back_populates="document", uselist=False, cascade="all, delete-orphan")
-    chunks = relationship("DocumentChunk", back_populates="document", cascade="all, delete-orphan")
-    pipeline_tasks = relationship("PipelineTask", back_populates="document", cascade="all, delete-orphan")
-    qa_reviews = relationship("QAReview", back_populates="document", cascade="all, delete-orphan")
+    extracted_text = relationship("ExtractedText", back_populates="document", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    chunks = relationship("DocumentChunk", back_populates="document", cascade="all, delete-orphan", passive_deletes=True)
+    pipeline_tasks = relationship("PipelineTask", back_populates="document", cascade="all, delete-orphan", passive_deletes=True)
+    qa_reviews = relationship("QAReview", back_populates="document", cascade="all, delete-orphan", passive_deletes=True)
+    
+    __table_args__ = (
+        # Matches the document list ordering for keyset pagination
+        Index("ix_documents_priority_created_id", priority.desc(), created_at.desc(), id.desc()),
+        # Same ordering behind the status/step filters of the document list
+        Index(
+            "ix_documents_status_step_priority_created",
+            status, current_step, priority.desc(), created_at.desc(), id.desc()
+        ),
+    )
     
     def __repr__(self):
         return f"<Document {self.id}: {self.original_filename} ({self.status.value})>"
@@ -121,8 +138,8 @@ class ExtractedText(Base):
     processed_at = Column(DateTime, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utc_now())
+    updated_at = Column(DateTime, server_default=utc_now(), onupdate=utc_now())
     
     # Relationships
     document = relationship("Document", back_populates="extracted_text")
@@ -168,13 +185,18 @@ class DocumentChunk(Base):
     embedding_model = Column(String(100), nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utc_now())
+    updated_at = Column(DateTime, server_default=utc_now(), onupdate=utc_now())
     
     # Relationships
     document = relationship("Document", back_populates="chunks")
     processed_by = relationship("User", foreign_keys=[processed_by_id])
     
+    __table_args__ = (
+        # Serves ordered, keyset-paginated chunk reads per document
+        Index("ix_document_chunks_document_index", document_id, chunk_index),
+    )
+    
     def __repr__(self):
         return f"<DocumentChunk {self.chunk_index} of Document {self.document_id}>"
 
@@ -215,14 +237,21 @@ class PipelineTask(Base):
     actual_time_minutes = Column(Integer, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utc_now())
+    updated_at = Column(DateTime, server_default=utc_now(), onupdate=utc_now())
     
     # Relationships
     document = relationship("Document", back_populates="pipeline_tasks")
     assigned_to = relationship("User", foreign_keys=[assigned_to_id])
     assigned_by = relationship("User", foreign_keys=[assigned_by_id])
     
+    __table_args__ = (
+        # Serves the per-user task dashboard (status buckets + completed today)
+        Index("ix_pipeline_tasks_user_status_completed", assigned_to_id, status, completed_at.desc()),
+        # Looks up a document's task for a given step
+        Index("ix_pipeline_tasks_document_step", document_id, step),
+    )
+    
     def __repr__(self):
         return f"<PipelineTask {self.step.value} for Document {self.document_id}>"
 
@@ -258,12 +287,17 @@ class QAReview(Base):
     checklist = Column(JSON, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utc_now())
     
     # Relationships
     document = relationship("Document", back_populates="qa_reviews")
     reviewer = relationship("User", foreign_keys=[reviewer_id])
     
+    __table_args__ = (
+        # Serves a document's review history, newest first
+        Index("ix_qa_reviews_document_created", document_id, created_at.desc()),
+    )
+    
     def __repr__(self):
         return f"<QAReview {self.id} for Document {self.document_id}>"
 
@@ -306,8 +340,8 @@ class DocumentMetadata(Base):
     processed_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utc_now())
+    updated_at = Column(DateTime, server_default=utc_now(), onupdate=utc_now())
     
     # Relationships
     document = relationship("Document")
@@ -332,7 +366,7 @@ class PublishedDocument(Base):
     
     # Publication details
     published_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    published_at = Column(DateTime, default=datetime.utcnow)
+    published_at = Column(DateTime, server_default=utc_now())
     
     # Search optimization
     search_keywords = Column(JSON, nullable=True)
@@ -343,8 +377,8 @@ class PublishedDocument(Base):
     download_count = Column(Integer, default=0)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utc_now())
+    updated_at = Column(DateTime, server_default=utc_now(), onupdate=utc_now())
     
     # Relationships
     document = relationship("Document")
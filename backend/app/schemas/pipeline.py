@@ -89,12 +89,11 @@ class DocumentResponse(DocumentBase):
 
 
 class DocumentListResponse(BaseModel):
-    """Paginated document list response"""
+    """Paginated document list response (keyset pagination)"""
     documents: List[DocumentResponse]
-    total: int
-    page: int
     page_size: int
-    total_pages: int
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
+    total: Optional[int] = None  # Only set when include_total or estimate_total is true
 
 
 # ========== Extracted Text Schemas ==========
@@ -248,6 +247,12 @@ class TaskAssign(BaseModel):
     estimated_time_minutes: Optional[int] = None
 
 
+class TaskBulkAssign(BaseModel):
+    """Schema for assigning several tasks to one user"""
+    task_ids: List[int] = Field(..., min_length=1, max_length=500)
+    assigned_to_id: int
+
+
 class TaskUpdate(BaseModel):
     """Schema for updating task progress"""
     status: Optional[TaskStatusEnum] = None
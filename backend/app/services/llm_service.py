@@ -3,10 +3,15 @@ LLM Service - Ollama Integration
 Uses local Ollama with gemma3:1b model
 100% Open Source - No API keys needed
 """
+import asyncio
+import logging
 import httpx
-from typing import Optional, List, Dict
+import orjson
+from typing import Optional, List, Dict, Any
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 
 # System prompts for different use cases
 SYSTEM_PROMPTS = {
@@ -22,63 +27,159 @@ Be precise and factual.""",
 Provide clear and concise responses."""
 }
 
+# System prompt followed by the turn separator, built once per persona
+_PROMPT_PREFIXES = {name: f"{prompt}\n\n" for name, prompt in SYSTEM_PROMPTS.items()}
+
+# Request fields that are the same for every generate call
+_STATIC_PAYLOAD = {
+    "model": settings.OLLAMA_MODEL,
+    "stream": False,
+    "keep_alive": settings.OLLAMA_KEEP_ALIVE,
+}
+_JSON_HEADERS = {"content-type": "application/json"}
+
+# Generation options for calls that use the configured defaults
+_DEFAULT_OPTIONS = {
+    "num_predict": settings.LLM_MAX_TOKENS,
+    "temperature": settings.LLM_TEMPERATURE,
+    # Ask for the window the chat history is budgeted against; otherwise Ollama
+    # uses its own default and truncates the start (system prompt) of long prompts
+    "num_ctx": settings.LLM_CONTEXT_TOKENS,
+}
+
+# Exponential backoff between connection retries (seconds)
+RETRY_BASE_DELAY = 0.2
+RETRY_MAX_DELAY = 2.0
+
+# Rough characters-per-token ratio for English text with BPE tokenizers
+CHARS_PER_TOKEN = 4
+# Devanagari and other non-Latin scripts split into far more tokens per
+# character, so text that isn't pure ASCII is estimated from its UTF-8 size
+# (a Devanagari letter is 3 bytes -> 1.5 tokens, erring on the safe side)
+NON_ASCII_BYTES_PER_TOKEN = 2
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate token count for a piece of text
+    Approximation is close enough for budgeting the prompt against the context window
+    """
+    if not text:
+        return 0
+    if text.isascii():
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(text.encode("utf-8")) // NON_ASCII_BYTES_PER_TOKEN + 1
+
 
 class LLMService:
     """
     LLM Service using Ollama
-    Singleton pattern - only one instance created
+    One instance is created per process in the app lifespan (app.state.llm)
     """
-    _instance: Optional['LLMService'] = None
-    _client: Optional[httpx.Client] = None
-    _is_available: bool = False
-    
-    @classmethod
-    def get_instance(cls) -> 'LLMService':
-        """Get singleton instance"""
-        if cls._instance is None:
-            cls._instance = cls()
-        return cls._instance
     
     def __init__(self):
-        """Initialize LLM service"""
-        if LLMService._client is None:
-            LLMService._client = httpx.Client(timeout=settings.OLLAMA_TIMEOUT)
-            self._check_ollama()
+        """Initialize LLM service (call aconnect() before use)"""
+        self._client: Optional[httpx.AsyncClient] = None
+        self._is_available: bool = False
+        self._recheck_task: Optional[asyncio.Task] = None
+        self._warmup_task: Optional[asyncio.Task] = None
     
-    def _check_ollama(self) -> None:
+    async def aconnect(self) -> None:
+        """Open the HTTP client and check the Ollama connection"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=settings.OLLAMA_TIMEOUT)
+        await self._check_ollama()
+        if self._is_available:
+            # Load the model in the background so startup (and /health) isn't
+            # held up for as long as OLLAMA_TIMEOUT while Ollama loads weights
+            self._warmup_task = asyncio.create_task(self._warmup())
+        else:
+            self._schedule_recheck()
+    
+    async def aclose(self) -> None:
+        """Stop background warmup/re-probing and close the HTTP client"""
+        for task in (self._warmup_task, self._recheck_task):
+            if task is not None:
+                task.cancel()
+        self._warmup_task = None
+        self._recheck_task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._is_available = False
+    
+    async def _check_ollama(self) -> None:
         """Check if Ollama is running and model is available"""
         try:
-            response = LLMService._client.get(
+            response = await self._client.get(
                 f"{settings.OLLAMA_URL}/api/tags",
                 timeout=5.0
             )
             if response.status_code == 200:
-                models = response.json().get("models", [])
-                model_names = [m.get("name", "") for m in models]
+                models = orjson.loads(response.content).get("models", [])
+                model_names = {m.get("name", "") for m in models}
                 
-                # Check if our model is available
-                if any(settings.OLLAMA_MODEL in name for name in model_names):
-                    LLMService._is_available = True
-                    print(f"✅ Ollama connected: {settings.OLLAMA_URL}")
-                    print(f"✅ Model ready: {settings.OLLAMA_MODEL}")
+                # Check if our model is available (an untagged name means ":latest")
+                model = settings.OLLAMA_MODEL
+                if model in model_names or (":" not in model and f"{model}:latest" in model_names):
+                    self._is_available = True
+                    logger.info("Ollama connected: %s", settings.OLLAMA_URL)
+                    logger.info("Model ready: %s", settings.OLLAMA_MODEL)
                 else:
-                    print(f"⚠️ Model '{settings.OLLAMA_MODEL}' not found in Ollama")
-                    print(f"   Available models: {model_names}")
-                    print(f"   Run: ollama pull {settings.OLLAMA_MODEL}")
+                    logger.warning(
+                        "Model '%s' not found in Ollama (available: %s). Run: ollama pull %s",
+                        settings.OLLAMA_MODEL, sorted(model_names), settings.OLLAMA_MODEL
+                    )
             else:
-                print(f"⚠️ Ollama returned status: {response.status_code}")
+                logger.warning("Ollama returned status: %s", response.status_code)
         except httpx.ConnectError:
-            print(f"⚠️ Cannot connect to Ollama at {settings.OLLAMA_URL}")
-            print("   Start Ollama with: ollama serve")
+            logger.warning(
+                "Cannot connect to Ollama at %s. Start Ollama with: ollama serve",
+                settings.OLLAMA_URL
+            )
         except Exception as e:
-            print(f"⚠️ Ollama check failed: {str(e)}")
+            logger.warning("Ollama check failed: %s", e)
+    
+    def _schedule_recheck(self) -> None:
+        """Start re-probing Ollama in the background unless already doing so"""
+        if self._recheck_task is None or self._recheck_task.done():
+            self._recheck_task = asyncio.create_task(self._recheck_loop())
+    
+    async def _recheck_loop(self) -> None:
+        """Re-probe Ollama until it is reachable again, then warm it up"""
+        while self._client is not None:
+            await asyncio.sleep(settings.OLLAMA_RECHECK_INTERVAL)
+            await self._check_ollama()
+            if self._is_available:
+                await self._warmup()
+            if self._is_available:
+                return
+    
+    async def _post_with_retry(self, url: str, body: bytes) -> httpx.Response:
+        """POST to Ollama, retrying connection failures with exponential backoff"""
+        delay = RETRY_BASE_DELAY
+        for attempt in range(1, settings.OLLAMA_RETRY_ATTEMPTS + 1):
+            try:
+                return await self._client.post(url, content=body, headers=_JSON_HEADERS)
+            except httpx.ConnectError:
+                if attempt >= settings.OLLAMA_RETRY_ATTEMPTS:
+                    raise
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RETRY_MAX_DELAY)
+    
+    async def _warmup(self) -> None:
+        """
+        Send a 1-token request so Ollama loads the model weights and caches
+        the default system prompt prefix before the first real request
+        """
+        await self.generate(prompt="ping", max_tokens=1)
     
     @property
     def is_available(self) -> bool:
         """Check if LLM service is available"""
-        return LLMService._is_available
+        return self._is_available
     
-    def generate(
+    async def generate(
         self,
         prompt: str,
         system_prompt: str = None,
@@ -99,50 +200,58 @@ class LLMService:
         Returns:
             Generated text response
         """
-        if not LLMService._is_available:
-            return "⚠️ LLM service not available. Please ensure Ollama is running."
-        
         # Use defaults from settings
-        max_tokens = max_tokens or settings.LLM_MAX_TOKENS
-        temperature = temperature or settings.LLM_TEMPERATURE
+        if max_tokens is None and temperature is None:
+            options = _DEFAULT_OPTIONS
+        else:
+            options = {
+                "num_predict": max_tokens or settings.LLM_MAX_TOKENS,
+                "temperature": temperature or settings.LLM_TEMPERATURE,
+                "num_ctx": settings.LLM_CONTEXT_TOKENS
+            }
         system_prompt = system_prompt or SYSTEM_PROMPTS["legal_assistant"]
         
         # Build full prompt
         full_prompt = f"{system_prompt}\n\nUser: {prompt}\n\nAssistant:"
         
+        return await self._complete(full_prompt, options)
+    
+    async def _complete(self, full_prompt: str, options: Dict[str, Any]) -> str:
+        """Send a fully built prompt to Ollama and return the cleaned response"""
+        if not self._is_available:
+            return "⚠️ LLM service not available. Please ensure Ollama is running."
+        
         try:
-            response = LLMService._client.post(
+            body = orjson.dumps({
+                **_STATIC_PAYLOAD,
+                "prompt": full_prompt,
+                "options": options
+            })
+            response = await self._post_with_retry(
                 f"{settings.OLLAMA_URL}/api/generate",
-                json={
-                    "model": settings.OLLAMA_MODEL,
-                    "prompt": full_prompt,
-                    "stream": False,
-                    "options": {
-                        "num_predict": max_tokens,
-                        "temperature": temperature
-                    }
-                }
+                body
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 result = data.get("response", "").strip()
                 # Remove "Assistant:" prefix if model includes it
-                if result.lower().startswith("assistant:"):
+                if result[:10].lower() == "assistant:":
                     result = result[10:].strip()
                 return result
             else:
                 return f"Error: Ollama returned status {response.status_code}"
                 
         except httpx.ConnectError:
-            LLMService._is_available = False
-            return "⚠️ Lost connection to Ollama. Please restart Ollama."
+            self._is_available = False
+            self._schedule_recheck()
+            return "⚠️ Lost connection to Ollama. Retrying in the background, please try again shortly."
         except httpx.TimeoutException:
             return "⚠️ Request timed out. Please try again."
         except Exception as e:
             return f"Error: {str(e)}"
     
-    def chat(
+    async def chat(
         self,
         message: str,
         history: List[Dict[str, str]] = None,
@@ -159,25 +268,33 @@ class LLMService:
         Returns:
             Assistant response
         """
-        system_prompt = SYSTEM_PROMPTS.get(persona, SYSTEM_PROMPTS["general"])
+        if persona not in SYSTEM_PROMPTS:
+            persona = "general"
+        system_prompt = SYSTEM_PROMPTS[persona]
+        parts = [_PROMPT_PREFIXES[persona]]
         
-        # Build conversation context
-        context = ""
+        # Add conversation context from the most recent messages that
+        # fit in the context window after the system prompt, message and reply
         if history:
-            for msg in history[-6:]:  # Last 6 messages for context
+            budget = (
+                settings.LLM_CONTEXT_TOKENS
+                - settings.LLM_MAX_TOKENS
+                - estimate_tokens(system_prompt)
+                - estimate_tokens(message)
+            )
+            lines = []
+            for msg in reversed(history):
                 role = "User" if msg.get("role") == "user" else "Assistant"
-                context += f"{role}: {msg.get('content', '')}\n"
+                line = f"{role}: {msg.get('content', '')}\n"
+                budget -= estimate_tokens(line)
+                if budget < 0:
+                    break
+                lines.append(line)
+            parts.extend(reversed(lines))
         
-        # Build final prompt
-        if context:
-            prompt = f"{context}User: {message}"
-        else:
-            prompt = message
+        parts.append(f"User: {message}\n\nAssistant:")
         
-        return self.generate(
-            prompt=prompt,
-            system_prompt=system_prompt
-        )
+        return await self._complete("".join(parts), _DEFAULT_OPTIONS)
     
     def get_info(self) -> dict:
         """Get service information"""
@@ -185,14 +302,8 @@ class LLMService:
             "provider": "Ollama",
             "model": settings.OLLAMA_MODEL,
             "url": settings.OLLAMA_URL,
-            "available": LLMService._is_available,
+            "available": self._is_available,
             "max_tokens": settings.LLM_MAX_TOKENS,
             "temperature": settings.LLM_TEMPERATURE
         }
 
-
-# Convenience function
-def get_llm_service() -> LLMService:
-    """Get LLM service instance"""
-    return LLMService.get_instance()
-
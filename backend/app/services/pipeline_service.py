@@ -3,19 +3,77 @@ Pipeline Service - Business logic for document processing pipeline
 """
 import os
 import uuid
+import asyncio
+import orjson
+import aiofiles.os
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any, Tuple
-from sqlalchemy import select, func, and_, or_
+from typing import List, Optional, Dict, Any, Tuple, Set, Sequence
+from sqlalchemy import select, insert, update, delete, func, and_, or_, tuple_, bindparam, DateTime
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, raiseload
 
 from app.models.document_pipeline import (
     Document, DocumentStatus, TaskStatus, PipelineStep,
     ExtractedText, DocumentChunk, PipelineTask, QAReview,
-    DocumentMetadata, PublishedDocument
+    DocumentMetadata, PublishedDocument, utc_now
 )
 from app.models.user import User, UserRole
 from app.core.config import settings
+from app.core.cache import get_or_compute
+
+
+# Pipeline steps in processing order, and the step that follows each one
+PIPELINE_STEP_ORDER = (
+    PipelineStep.UPLOAD,
+    PipelineStep.TEXT_EXTRACTION,
+    PipelineStep.CHUNKING,
+    PipelineStep.METADATA,
+    PipelineStep.SUMMARIZATION,
+    PipelineStep.QUALITY_ASSURANCE,
+    PipelineStep.PUBLISH
+)
+NEXT_PIPELINE_STEP = dict(zip(PIPELINE_STEP_ORDER, PIPELINE_STEP_ORDER[1:]))
+
+# Chunk batches at or above this size are loaded with COPY instead of INSERT
+COPY_THRESHOLD = 100
+
+# Dashboard bucket for each open task status (completed tasks are filtered by date)
+_USER_TASK_BUCKETS = {
+    TaskStatus.PENDING: "pending",
+    TaskStatus.IN_PROGRESS: "in_progress",
+    TaskStatus.REVISION_REQUIRED: "revision_required",
+}
+
+# Relationships get_document can eager-load on request (chunks are paged via get_chunks)
+_DOCUMENT_RELATIONS = {
+    "extracted_text": Document.extracted_text,
+    "pipeline_tasks": Document.pipeline_tasks,
+    "qa_reviews": Document.qa_reviews,
+}
+
+# Columns that the update/save methods accept from request payloads
+_DOCUMENT_COLUMNS = frozenset(Document.__table__.columns.keys())
+_CHUNK_COLUMNS = frozenset(DocumentChunk.__table__.columns.keys())
+_METADATA_COLUMNS = frozenset(DocumentMetadata.__table__.columns.keys())
+
+# Column order for COPY into document_chunks
+_CHUNK_COPY_COLUMNS = (
+    "document_id", "chunk_index", "content", "start_page", "end_page",
+    "token_count", "heading", "section_type", "chunk_metadata",
+    "processed_by_id", "is_embedded"
+)
+
+# Keeps fire-and-forget file removals referenced until they finish
+_background_tasks: Set[asyncio.Task] = set()
+
+
+async def _remove_file(path: str) -> None:
+    """Delete a file from disk without blocking the event loop"""
+    try:
+        await aiofiles.os.remove(path)
+    except OSError:
+        pass  # Continue even if file deletion fails
 
 
 class PipelineService:
@@ -70,8 +128,8 @@ class PipelineService:
             step=PipelineStep.UPLOAD,
             status=TaskStatus.COMPLETED,
             assigned_to_id=uploaded_by_id,
-            started_at=datetime.utcnow(),
-            completed_at=datetime.utcnow()
+            started_at=utc_now(),
+            completed_at=utc_now()
         )
         self.db.add(upload_task)
         
@@ -82,90 +140,171 @@ class PipelineService:
         await self.db.refresh(document)
         return document
     
-    async def get_document(self, document_id: int) -> Optional[Document]:
-        """Get document by ID with all related data"""
+    async def get_document(
+        self,
+        document_id: int,
+        include: Sequence[str] = ("extracted_text", "qa_reviews")
+    ) -> Optional[Document]:
+        """
+        Get document by ID with the named related data loaded
+        
+        Args:
+            include: Relationships to load (extracted_text, pipeline_tasks, qa_reviews).
+                     Any other relationship access raises; use get_chunks for chunks.
+        """
+        unknown = set(include) - _DOCUMENT_RELATIONS.keys()
+        if unknown:
+            raise ValueError(f"Cannot include: {', '.join(sorted(unknown))}")
+        
         result = await self.db.execute(
             select(Document)
             .options(
-                selectinload(Document.extracted_text),
-                selectinload(Document.chunks),
-                selectinload(Document.pipeline_tasks),
-                selectinload(Document.qa_reviews)
+                *(selectinload(_DOCUMENT_RELATIONS[name]) for name in include),
+                raiseload("*")
             )
             .where(Document.id == document_id)
         )
         return result.scalar_one_or_none()
     
+    async def get_document_basic(self, document_id: int) -> Optional[Document]:
+        """Get document by ID without related data (relationship access raises)"""
+        result = await self.db.execute(
+            select(Document)
+            .options(raiseload("*"))
+            .where(Document.id == document_id)
+        )
+        return result.scalar_one_or_none()
+    
     async def get_documents(
         self,
         status: Optional[DocumentStatus] = None,
         step: Optional[PipelineStep] = None,
         category: Optional[str] = None,
-        page: int = 1,
-        page_size: int = 20
-    ) -> Tuple[List[Document], int]:
-        """Get paginated list of documents with filters"""
-        query = select(Document)
-        count_query = select(func.count(Document.id))
+        cursor: Optional[Tuple[int, datetime, int]] = None,
+        page_size: int = 20,
+        include_total: bool = False
+    ) -> Tuple[List[Document], Optional[Tuple[int, datetime, int]], Optional[int]]:
+        """
+        Get a page of documents with filters using keyset pagination
         
+        Documents are ordered by (priority, created_at, id) descending. Pass the
+        returned next_cursor to get the following page; it is None on the last page.
+        The total count is only computed when include_total is set.
+        
+        Returns:
+            (documents, next_cursor, total)
+        """
+        filters = []
         if status:
-            query = query.where(Document.status == status)
-            count_query = count_query.where(Document.status == status)
+            filters.append(Document.status == status)
         if step:
-            query = query.where(Document.current_step == step)
-            count_query = count_query.where(Document.current_step == step)
+            filters.append(Document.current_step == step)
         if category:
-            query = query.where(Document.category == category)
-            count_query = count_query.where(Document.category == category)
+            filters.append(Document.category == category)
+        
+        query = select(Document).where(*filters)
         
-        # Get total count
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
+        # On the first page the total comes from a window count on the same
+        # query; after that the cursor predicate would skew it, so count separately
+        total = None
+        count_in_page = include_total and not cursor
+        if include_total and cursor:
+            total_result = await self.db.execute(
+                select(func.count(Document.id)).where(*filters)
+            )
+            total = total_result.scalar()
         
-        # Get paginated results
-        query = query.order_by(Document.priority.desc(), Document.created_at.desc())
-        query = query.offset((page - 1) * page_size).limit(page_size)
+        # Seek past the last row of the previous page
+        if cursor:
+            query = query.where(
+                tuple_(Document.priority, Document.created_at, Document.id) < tuple_(*cursor)
+            )
+        if count_in_page:
+            query = query.add_columns(func.count().over().label("total"))
+        query = query.order_by(
+            Document.priority.desc(), Document.created_at.desc(), Document.id.desc()
+        ).limit(page_size + 1)
         result = await self.db.execute(query)
-        documents = result.scalars().all()
+        if count_in_page:
+            rows = result.all()
+            documents = [row[0] for row in rows]
+            total = rows[0].total if rows else 0
+        else:
+            documents = list(result.scalars().all())
+        
+        # The extra row only tells us whether another page exists
+        next_cursor = None
+        if len(documents) > page_size:
+            documents = documents[:page_size]
+            last = documents[-1]
+            next_cursor = (last.priority, last.created_at, last.id)
+        
+        return documents, next_cursor, total
+    
+    async def estimate_documents_count(
+        self,
+        status: Optional[DocumentStatus] = None,
+        step: Optional[PipelineStep] = None,
+        category: Optional[str] = None
+    ) -> int:
+        """
+        Estimate the number of matching documents from the PostgreSQL planner
+        Much cheaper than COUNT(*) on large tables; fine for dashboard ballparks
+        """
+        query = select(Document.id)
+        if status:
+            query = query.where(Document.status == status)
+        if step:
+            query = query.where(Document.current_step == step)
+        if category:
+            query = query.where(Document.category == category)
         
-        return list(documents), total
+        conn = await self.db.connection()
+        compiled = query.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+        plan = result.scalar()
+        if isinstance(plan, (str, bytes)):
+            plan = orjson.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
     
     async def update_document(
         self,
         document_id: int,
         **kwargs
     ) -> Optional[Document]:
-        """Update document fields"""
-        document = await self.get_document(document_id)
-        if not document:
-            return None
-        
-        for key, value in kwargs.items():
-            if hasattr(document, key) and value is not None:
-                setattr(document, key, value)
-        
-        document.updated_at = datetime.utcnow()
+        """Update document fields (unknown keys and None values are ignored)"""
+        values = {
+            key: value for key, value in kwargs.items()
+            if key in _DOCUMENT_COLUMNS and value is not None
+        }
+        result = await self.db.scalars(
+            update(Document)
+            .where(Document.id == document_id)
+            .values(**values)
+            .returning(Document)
+            .execution_options(populate_existing=True)
+        )
+        document = result.one_or_none()
         await self.db.commit()
-        await self.db.refresh(document)
         return document
     
     async def delete_document(self, document_id: int) -> bool:
         """Delete document and all related data (cascading)"""
-        document = await self.get_document(document_id)
-        if not document:
+        # Related rows are removed by the ON DELETE CASCADE foreign keys
+        result = await self.db.execute(
+            delete(Document)
+            .where(Document.id == document_id)
+            .returning(Document.file_path)
+        )
+        file_path = result.scalar_one_or_none()
+        if file_path is None:
             return False
-        
-        # Delete the physical file if it exists
-        import os
-        if os.path.exists(document.file_path):
-            try:
-                os.remove(document.file_path)
-            except Exception:
-                pass  # Continue even if file deletion fails
-        
-        # SQLAlchemy cascade will handle related records
-        await self.db.delete(document)
         await self.db.commit()
+        
+        # Delete the physical file in the background so the response isn't held up
+        task = asyncio.create_task(_remove_file(file_path))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
         return True
     
     # ========== Text Extraction Operations ==========
@@ -178,46 +317,46 @@ class PipelineService:
         extraction_method: Optional[str] = None,
         confidence_score: Optional[float] = None,
         processed_by_id: Optional[int] = None,
-        is_draft: bool = False
+        is_draft: bool = False,
+        complete_task: bool = False
     ) -> ExtractedText:
         """Save extracted text for a document
         
         Args:
             is_draft: If True, only saves the text without updating document step/status
+            complete_task: If True, also completes processed_by_id's in-progress
+                           text extraction task (in the same transaction)
         """
-        # Check if extraction already exists
-        result = await self.db.execute(
-            select(ExtractedText).where(ExtractedText.document_id == document_id)
-        )
-        existing = result.scalar_one_or_none()
-        
-        if existing:
-            existing.raw_text = raw_text
-            existing.cleaned_text = cleaned_text
-            existing.extraction_method = extraction_method
-            existing.confidence_score = confidence_score
-            existing.processed_by_id = processed_by_id
-            existing.processed_at = datetime.utcnow()
-            existing.updated_at = datetime.utcnow()
-            extracted_text = existing
-        else:
-            extracted_text = ExtractedText(
-                document_id=document_id,
-                raw_text=raw_text,
-                cleaned_text=cleaned_text,
-                extraction_method=extraction_method,
-                confidence_score=confidence_score,
-                processed_by_id=processed_by_id,
-                processed_at=datetime.utcnow()
+        # Insert or update the extraction in one statement
+        now = utc_now()
+        values = {
+            "raw_text": raw_text,
+            "cleaned_text": cleaned_text,
+            "extraction_method": extraction_method,
+            "confidence_score": confidence_score,
+            "processed_by_id": processed_by_id,
+            "processed_at": now
+        }
+        stmt = (
+            pg_insert(ExtractedText)
+            .values(document_id=document_id, **values)
+            .on_conflict_do_update(
+                index_elements=[ExtractedText.document_id],
+                set_={**values, "updated_at": now}
             )
-            self.db.add(extracted_text)
+            .returning(ExtractedText)
+            .execution_options(populate_existing=True)
+        )
+        extracted_text = (await self.db.scalars(stmt)).one()
         
         # Only update document status if NOT a draft
         if not is_draft:
             await self._update_document_step(document_id, PipelineStep.TEXT_EXTRACTION, DocumentStatus.TEXT_EXTRACTED)
         
+        if complete_task and processed_by_id is not None:
+            await self._complete_user_step_task(document_id, PipelineStep.TEXT_EXTRACTION, processed_by_id)
+        
         await self.db.commit()
-        await self.db.refresh(extracted_text)
         return extracted_text
     
     async def get_extracted_text(self, document_id: int) -> Optional[ExtractedText]:
@@ -241,61 +380,99 @@ class PipelineService:
             DocumentChunk.__table__.delete().where(DocumentChunk.document_id == document_id)
         )
         
+        # Insert all chunks in one batched statement (insertmanyvalues)
+        rows = [
+            {
+                "document_id": document_id,
+                "chunk_index": chunk_data.get("chunk_index", 0),
+                "content": chunk_data["content"],
+                "start_page": chunk_data.get("start_page"),
+                "end_page": chunk_data.get("end_page"),
+                "token_count": chunk_data.get("token_count"),
+                "heading": chunk_data.get("heading"),
+                "section_type": chunk_data.get("section_type"),
+                "chunk_metadata": chunk_data.get("chunk_metadata"),
+                "processed_by_id": processed_by_id
+            }
+            for chunk_data in chunks
+        ]
         created_chunks = []
-        for chunk_data in chunks:
-            chunk = DocumentChunk(
-                document_id=document_id,
-                chunk_index=chunk_data.get("chunk_index", 0),
-                content=chunk_data["content"],
-                start_page=chunk_data.get("start_page"),
-                end_page=chunk_data.get("end_page"),
-                token_count=chunk_data.get("token_count"),
-                heading=chunk_data.get("heading"),
-                section_type=chunk_data.get("section_type"),
-                metadata=chunk_data.get("metadata"),
-                processed_by_id=processed_by_id
+        if len(rows) >= COPY_THRESHOLD and self.db.get_bind().dialect.driver == "asyncpg":
+            await self._copy_chunks(rows)
+            created_chunks = await self.get_chunks(document_id)
+        elif rows:
+            result = await self.db.scalars(
+                insert(DocumentChunk).returning(DocumentChunk),
+                rows
             )
-            self.db.add(chunk)
-            created_chunks.append(chunk)
-        
-        # Update document
-        document = await self.get_document(document_id)
-        if document:
-            document.chunk_count = len(chunks)
+            created_chunks = list(result.all())
         
-        # Update document status
-        await self._update_document_step(document_id, PipelineStep.CHUNKING, DocumentStatus.CHUNKED)
+        # Update document status and chunk count
+        await self._update_document_step(
+            document_id, PipelineStep.CHUNKING, DocumentStatus.CHUNKED,
+            chunk_count=len(chunks)
+        )
         
         await self.db.commit()
-        for chunk in created_chunks:
-            await self.db.refresh(chunk)
         return created_chunks
     
-    async def get_chunks(self, document_id: int) -> List[DocumentChunk]:
-        """Get all chunks for a document"""
-        result = await self.db.execute(
-            select(DocumentChunk)
-            .where(DocumentChunk.document_id == document_id)
-            .order_by(DocumentChunk.chunk_index)
+    async def _copy_chunks(self, rows: List[Dict[str, Any]]) -> None:
+        """Load chunk rows with PostgreSQL COPY on the session's asyncpg connection"""
+        records = []
+        for row in rows:
+            # created_at/updated_at are left to the column server defaults
+            values = dict(row, is_embedded=False)
+            # COPY bypasses SQLAlchemy's JSON type, so send the JSON text directly
+            if values["chunk_metadata"] is not None:
+                values["chunk_metadata"] = orjson.dumps(values["chunk_metadata"]).decode()
+            records.append(tuple(values[column] for column in _CHUNK_COPY_COLUMNS))
+        
+        conn = await self.db.connection()
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            DocumentChunk.__tablename__,
+            records=records,
+            columns=_CHUNK_COPY_COLUMNS
         )
+    
+    async def get_chunks(
+        self,
+        document_id: int,
+        after_index: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[DocumentChunk]:
+        """
+        Get chunks for a document in chunk_index order
+        
+        Args:
+            after_index: Only return chunks after this chunk_index (keyset pagination)
+            limit: Max chunks to return (all remaining chunks if not set)
+        """
+        query = select(DocumentChunk).where(DocumentChunk.document_id == document_id)
+        if after_index is not None:
+            query = query.where(DocumentChunk.chunk_index > after_index)
+        query = query.order_by(DocumentChunk.chunk_index)
+        if limit is not None:
+            query = query.limit(limit)
+        
+        result = await self.db.execute(query)
         return list(result.scalars().all())
     
     async def update_chunk(self, chunk_id: int, **kwargs) -> Optional[DocumentChunk]:
-        """Update a specific chunk"""
-        result = await self.db.execute(
-            select(DocumentChunk).where(DocumentChunk.id == chunk_id)
+        """Update a specific chunk (unknown keys and None values are ignored)"""
+        values = {
+            key: value for key, value in kwargs.items()
+            if key in _CHUNK_COLUMNS and value is not None
+        }
+        result = await self.db.scalars(
+            update(DocumentChunk)
+            .where(DocumentChunk.id == chunk_id)
+            .values(**values)
+            .returning(DocumentChunk)
+            .execution_options(populate_existing=True)
         )
-        chunk = result.scalar_one_or_none()
-        if not chunk:
-            return None
-        
-        for key, value in kwargs.items():
-            if hasattr(chunk, key) and value is not None:
-                setattr(chunk, key, value)
-        
-        chunk.updated_at = datetime.utcnow()
+        chunk = result.one_or_none()
         await self.db.commit()
-        await self.db.refresh(chunk)
         return chunk
     
     # ========== Metadata Operations ==========
@@ -307,33 +484,31 @@ class PipelineService:
         processed_by_id: Optional[int] = None
     ) -> DocumentMetadata:
         """Save metadata for a document"""
-        result = await self.db.execute(
-            select(DocumentMetadata).where(DocumentMetadata.document_id == document_id)
-        )
-        existing = result.scalar_one_or_none()
-        
-        if existing:
-            for key, value in metadata.items():
-                if hasattr(existing, key):
-                    setattr(existing, key, value)
-            existing.processed_by_id = processed_by_id
-            existing.updated_at = datetime.utcnow()
-            doc_metadata = existing
-        else:
-            doc_metadata = DocumentMetadata(
-                document_id=document_id,
-                processed_by_id=processed_by_id,
-                **metadata
-            )
-            self.db.add(doc_metadata)
+        doc_metadata = await self._upsert_metadata(document_id, {
+            **{key: value for key, value in metadata.items() if key in _METADATA_COLUMNS},
+            "processed_by_id": processed_by_id
+        })
         
         # Update document status
         await self._update_document_step(document_id, PipelineStep.METADATA, DocumentStatus.METADATA_ADDED)
         
         await self.db.commit()
-        await self.db.refresh(doc_metadata)
         return doc_metadata
     
+    async def _upsert_metadata(self, document_id: int, values: Dict[str, Any]) -> DocumentMetadata:
+        """Insert metadata for a document, or update the given columns if it exists"""
+        stmt = (
+            pg_insert(DocumentMetadata)
+            .values(document_id=document_id, **values)
+            .on_conflict_do_update(
+                index_elements=[DocumentMetadata.document_id],
+                set_={**values, "updated_at": utc_now()}
+            )
+            .returning(DocumentMetadata)
+            .execution_options(populate_existing=True)
+        )
+        return (await self.db.scalars(stmt)).one()
+    
     async def get_metadata(self, document_id: int) -> Optional[DocumentMetadata]:
         """Get metadata for a document"""
         result = await self.db.execute(
@@ -353,35 +528,32 @@ class PipelineService:
     ) -> DocumentMetadata:
         """Save summary for a document"""
         # Update or create metadata with summary
-        result = await self.db.execute(
-            select(DocumentMetadata).where(DocumentMetadata.document_id == document_id)
-        )
-        metadata = result.scalar_one_or_none()
-        
-        if metadata:
-            metadata.summary = summary
-            metadata.key_points = key_points
-            metadata.processed_by_id = processed_by_id
-            metadata.updated_at = datetime.utcnow()
-        else:
-            metadata = DocumentMetadata(
-                document_id=document_id,
-                summary=summary,
-                key_points=key_points,
-                processed_by_id=processed_by_id
-            )
-            self.db.add(metadata)
+        metadata = await self._upsert_metadata(document_id, {
+            "summary": summary,
+            "key_points": key_points,
+            "processed_by_id": processed_by_id
+        })
         
-        # Update chunk summaries if provided
+        # Update chunk summaries if provided (one executemany UPDATE)
         if chunk_summaries:
-            for chunk_id, chunk_summary in chunk_summaries.items():
-                await self.update_chunk(int(chunk_id), summary=chunk_summary)
+            chunks_table = DocumentChunk.__table__
+            await self.db.execute(
+                update(chunks_table)
+                .where(and_(
+                    chunks_table.c.id == bindparam("chunk_id"),
+                    chunks_table.c.document_id == document_id
+                ))
+                .values(summary=bindparam("chunk_summary")),
+                [
+                    {"chunk_id": int(chunk_id), "chunk_summary": chunk_summary}
+                    for chunk_id, chunk_summary in chunk_summaries.items()
+                ]
+            )
         
         # Update document status
         await self._update_document_step(document_id, PipelineStep.SUMMARIZATION, DocumentStatus.SUMMARIZED)
         
         await self.db.commit()
-        await self.db.refresh(metadata)
         return metadata
     
     # ========== QA Operations ==========
@@ -405,9 +577,11 @@ class PipelineService:
             await self._update_document_step(document_id, PipelineStep.QUALITY_ASSURANCE, DocumentStatus.QA_APPROVED)
         else:
             # Rejected - may need revision
-            document = await self.get_document(document_id)
-            if document:
-                document.status = DocumentStatus.REJECTED
+            await self.db.execute(
+                update(Document)
+                .where(Document.id == document_id)
+                .values(status=DocumentStatus.REJECTED)
+            )
         
         await self.db.commit()
         await self.db.refresh(review)
@@ -432,41 +606,41 @@ class PipelineService:
         search_weight: float = 1.0
     ) -> PublishedDocument:
         """Publish a document to the legal database"""
-        # Check if already published
-        result = await self.db.execute(
-            select(PublishedDocument).where(PublishedDocument.document_id == document_id)
-        )
-        existing = result.scalar_one_or_none()
-        
-        if existing:
-            existing.version += 1
-            existing.is_active = True
-            existing.published_by_id = published_by_id
-            existing.published_at = datetime.utcnow()
-            existing.search_keywords = search_keywords
-            existing.search_weight = search_weight
-            published = existing
-        else:
-            published = PublishedDocument(
-                document_id=document_id,
-                published_by_id=published_by_id,
-                search_keywords=search_keywords,
-                search_weight=search_weight
+        # Publish, or republish as the next version if already published
+        now = utc_now()
+        values = {
+            "published_by_id": published_by_id,
+            "published_at": now,
+            "search_keywords": search_keywords,
+            "search_weight": search_weight
+        }
+        stmt = (
+            pg_insert(PublishedDocument)
+            .values(document_id=document_id, **values)
+            .on_conflict_do_update(
+                index_elements=[PublishedDocument.document_id],
+                set_={
+                    **values,
+                    "version": PublishedDocument.__table__.c.version + 1,
+                    "is_active": True,
+                    "updated_at": now
+                }
             )
-            self.db.add(published)
+            .returning(PublishedDocument)
+            .execution_options(populate_existing=True)
+        )
+        published = (await self.db.scalars(stmt)).one()
         
         # Update document
-        document = await self.get_document(document_id)
-        if document:
-            document.current_step = PipelineStep.PUBLISH
-            document.status = DocumentStatus.PUBLISHED
-            document.published_at = datetime.utcnow()
+        await self._update_document_step(
+            document_id, PipelineStep.PUBLISH, DocumentStatus.PUBLISHED,
+            published_at=now
+        )
         
         # Complete publish task
         await self._complete_step_task(document_id, PipelineStep.PUBLISH, published_by_id)
         
         await self.db.commit()
-        await self.db.refresh(published)
         return published
     
     # ========== Task Management ==========
@@ -503,7 +677,7 @@ class PipelineService:
         
         task.assigned_to_id = assigned_to_id
         task.assigned_by_id = assigned_by_id
-        task.assigned_at = datetime.utcnow()
+        task.assigned_at = utc_now()
         task.notes = notes
         task.estimated_time_minutes = estimated_time
         
@@ -511,6 +685,31 @@ class PipelineService:
         await self.db.refresh(task)
         return task
     
+    async def assign_tasks_bulk(
+        self,
+        task_ids: List[int],
+        assigned_to_id: int,
+        assigned_by_id: int
+    ) -> List[PipelineTask]:
+        """Assign several tasks to a user with a single UPDATE"""
+        if not task_ids:
+            return []
+        
+        result = await self.db.scalars(
+            update(PipelineTask)
+            .where(PipelineTask.id.in_(task_ids))
+            .values(
+                assigned_to_id=assigned_to_id,
+                assigned_by_id=assigned_by_id,
+                assigned_at=utc_now()
+            )
+            .returning(PipelineTask)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        tasks = list(result.all())
+        await self.db.commit()
+        return tasks
+    
     async def start_task(self, task_id: int, user_id: int) -> Optional[PipelineTask]:
         """Start working on a task"""
         result = await self.db.execute(
@@ -525,7 +724,7 @@ class PipelineService:
             raise ValueError("Task is not assigned to this user")
         
         task.status = TaskStatus.IN_PROGRESS
-        task.started_at = datetime.utcnow()
+        task.started_at = utc_now()
         
         await self.db.commit()
         await self.db.refresh(task)
@@ -548,7 +747,7 @@ class PipelineService:
             return None
         
         task.status = TaskStatus.COMPLETED
-        task.completed_at = datetime.utcnow()
+        task.completed_at = utc_now()
         task.output_data = output_data
         if notes:
             task.notes = notes
@@ -588,57 +787,35 @@ class PipelineService:
     
     async def get_user_tasks(self, user_id: int) -> Dict[str, List[PipelineTask]]:
         """Get all tasks assigned to a user"""
-        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        today_start = func.date_trunc("day", utc_now(), type_=DateTime)
         
-        # Pending tasks
-        pending_result = await self.db.execute(
+        # Fetch every task the dashboard shows in one query, then bucket by status
+        result = await self.db.execute(
             select(PipelineTask)
             .where(and_(
                 PipelineTask.assigned_to_id == user_id,
-                PipelineTask.status == TaskStatus.PENDING
+                or_(
+                    PipelineTask.status.in_(list(_USER_TASK_BUCKETS)),
+                    and_(
+                        PipelineTask.status == TaskStatus.COMPLETED,
+                        PipelineTask.completed_at >= today_start
+                    )
+                )
             ))
             .order_by(PipelineTask.created_at)
         )
-        pending = list(pending_result.scalars().all())
-        
-        # In progress tasks
-        in_progress_result = await self.db.execute(
-            select(PipelineTask)
-            .where(and_(
-                PipelineTask.assigned_to_id == user_id,
-                PipelineTask.status == TaskStatus.IN_PROGRESS
-            ))
-        )
-        in_progress = list(in_progress_result.scalars().all())
-        
-        # Completed today
-        completed_result = await self.db.execute(
-            select(PipelineTask)
-            .where(and_(
-                PipelineTask.assigned_to_id == user_id,
-                PipelineTask.status == TaskStatus.COMPLETED,
-                PipelineTask.completed_at >= today_start
-            ))
-            .order_by(PipelineTask.completed_at.desc())
-        )
-        completed_today = list(completed_result.scalars().all())
-        
-        # Revision required
-        revision_result = await self.db.execute(
-            select(PipelineTask)
-            .where(and_(
-                PipelineTask.assigned_to_id == user_id,
-                PipelineTask.status == TaskStatus.REVISION_REQUIRED
-            ))
-        )
-        revision_required = list(revision_result.scalars().all())
         
-        return {
-            "pending": pending,
-            "in_progress": in_progress,
-            "completed_today": completed_today,
-            "revision_required": revision_required
+        tasks: Dict[str, List[PipelineTask]] = {
+            "pending": [],
+            "in_progress": [],
+            "completed_today": [],
+            "revision_required": []
         }
+        for task in result.scalars():
+            bucket = _USER_TASK_BUCKETS.get(task.status, "completed_today")
+            tasks[bucket].append(task)
+        tasks["completed_today"].sort(key=lambda task: task.completed_at, reverse=True)
+        return tasks
     
     async def get_available_tasks(self, step: Optional[PipelineStep] = None) -> List[PipelineTask]:
         """Get unassigned tasks available for pickup"""
@@ -657,55 +834,46 @@ class PipelineService:
     # ========== Statistics ==========
     
     async def get_pipeline_stats(self) -> Dict[str, Any]:
-        """Get pipeline statistics for dashboard"""
-        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        week_start = today_start - timedelta(days=7)
-        
-        # Total documents
-        total_result = await self.db.execute(select(func.count(Document.id)))
-        total_documents = total_result.scalar()
-        
-        # By status
-        status_result = await self.db.execute(
-            select(Document.status, func.count(Document.id))
-            .group_by(Document.status)
+        """Get pipeline statistics for dashboard (cached for a few seconds)"""
+        return await get_or_compute(
+            "pipeline_stats",
+            settings.PIPELINE_STATS_CACHE_TTL,
+            self._compute_pipeline_stats
         )
-        by_status = {row[0].value: row[1] for row in status_result}
-        
-        # By step
-        step_result = await self.db.execute(
-            select(Document.current_step, func.count(Document.id))
-            .group_by(Document.current_step)
-        )
-        by_step = {row[0].value: row[1] for row in step_result}
-        
-        # Task counts
-        pending_result = await self.db.execute(
-            select(func.count(PipelineTask.id))
-            .where(PipelineTask.status == TaskStatus.PENDING)
-        )
-        pending_tasks = pending_result.scalar()
+    
+    async def _compute_pipeline_stats(self) -> Dict[str, Any]:
+        """Run the statistics queries behind get_pipeline_stats"""
+        today_start = func.date_trunc("day", utc_now(), type_=DateTime)
+        week_start = today_start - timedelta(days=7)
         
-        in_progress_result = await self.db.execute(
-            select(func.count(PipelineTask.id))
-            .where(PipelineTask.status == TaskStatus.IN_PROGRESS)
+        # Document totals by status and step from one grouped query
+        doc_result = await self.db.execute(
+            select(Document.status, Document.current_step, func.count(Document.id))
+            .group_by(Document.status, Document.current_step)
         )
-        in_progress_tasks = in_progress_result.scalar()
-        
-        completed_result = await self.db.execute(
-            select(func.count(PipelineTask.id))
-            .where(and_(
-                PipelineTask.status == TaskStatus.COMPLETED,
-                PipelineTask.completed_at >= today_start
-            ))
-        )
-        completed_today = completed_result.scalar()
-        
-        published_result = await self.db.execute(
-            select(func.count(PublishedDocument.id))
-            .where(PublishedDocument.published_at >= week_start)
+        total_documents = 0
+        by_status: Dict[str, int] = {}
+        by_step: Dict[str, int] = {}
+        for status, step, count in doc_result:
+            total_documents += count
+            by_status[status.value] = by_status.get(status.value, 0) + count
+            by_step[step.value] = by_step.get(step.value, 0) + count
+        
+        # Task counts (FILTER aggregates) and weekly publications in one round-trip
+        counts_result = await self.db.execute(
+            select(
+                func.count(PipelineTask.id).filter(PipelineTask.status == TaskStatus.PENDING),
+                func.count(PipelineTask.id).filter(PipelineTask.status == TaskStatus.IN_PROGRESS),
+                func.count(PipelineTask.id).filter(and_(
+                    PipelineTask.status == TaskStatus.COMPLETED,
+                    PipelineTask.completed_at >= today_start
+                )),
+                select(func.count(PublishedDocument.id))
+                .where(PublishedDocument.published_at >= week_start)
+                .scalar_subquery()
+            )
         )
-        published_this_week = published_result.scalar()
+        pending_tasks, in_progress_tasks, completed_today, published_this_week = counts_result.one()
         
         return {
             "total_documents": total_documents,
@@ -718,19 +886,21 @@ class PipelineService:
         }
     
     # ========== Helper Methods ==========
+    # Helpers only stage writes; the calling public method commits once at the end
     
     async def _update_document_step(
         self,
         document_id: int,
         step: PipelineStep,
-        status: DocumentStatus
+        status: DocumentStatus,
+        **values
     ):
-        """Update document step and status"""
-        document = await self.get_document(document_id)
-        if document:
-            document.current_step = step
-            document.status = status
-            document.updated_at = datetime.utcnow()
+        """Update document step and status (plus any extra columns) in one UPDATE"""
+        await self.db.execute(
+            update(Document)
+            .where(Document.id == document_id)
+            .values(current_step=step, status=status, **values)
+        )
     
     async def _complete_step_task(
         self,
@@ -739,57 +909,61 @@ class PipelineService:
         user_id: int
     ):
         """Mark a step's task as completed"""
-        result = await self.db.execute(
-            select(PipelineTask).where(
-                and_(
-                    PipelineTask.document_id == document_id,
-                    PipelineTask.step == step
-                )
-            )
+        await self.db.execute(
+            update(PipelineTask)
+            .where(and_(
+                PipelineTask.document_id == document_id,
+                PipelineTask.step == step
+            ))
+            .values(status=TaskStatus.COMPLETED, completed_at=utc_now())
         )
-        task = result.scalar_one_or_none()
-        if task:
-            task.status = TaskStatus.COMPLETED
-            task.completed_at = datetime.utcnow()
         
         # Create next step task if not publish
         if step != PipelineStep.PUBLISH:
             await self._create_next_step_task(document_id, step)
     
+    async def _complete_user_step_task(
+        self,
+        document_id: int,
+        step: PipelineStep,
+        user_id: int
+    ):
+        """Complete the user's in-progress task for a step (if any) and queue the next step"""
+        result = await self.db.execute(
+            update(PipelineTask)
+            .where(and_(
+                PipelineTask.document_id == document_id,
+                PipelineTask.step == step,
+                PipelineTask.assigned_to_id == user_id,
+                PipelineTask.status == TaskStatus.IN_PROGRESS
+            ))
+            .values(status=TaskStatus.COMPLETED, completed_at=utc_now())
+            .returning(PipelineTask.id)
+        )
+        if result.first() is not None:
+            await self._create_next_step_task(document_id, step)
+    
     async def _create_next_step_task(self, document_id: int, current_step: PipelineStep):
         """Create task for the next pipeline step"""
-        step_order = [
-            PipelineStep.UPLOAD,
-            PipelineStep.TEXT_EXTRACTION,
-            PipelineStep.CHUNKING,
-            PipelineStep.METADATA,
-            PipelineStep.SUMMARIZATION,
-            PipelineStep.QUALITY_ASSURANCE,
-            PipelineStep.PUBLISH
-        ]
+        next_step = NEXT_PIPELINE_STEP.get(current_step)
+        if next_step is None:
+            return
         
-        try:
-            current_index = step_order.index(current_step)
-            if current_index < len(step_order) - 1:
-                next_step = step_order[current_index + 1]
-                
-                # Check if task already exists
-                result = await self.db.execute(
-                    select(PipelineTask).where(
-                        and_(
-                            PipelineTask.document_id == document_id,
-                            PipelineTask.step == next_step
-                        )
-                    )
+        # Check if task already exists
+        result = await self.db.execute(
+            select(PipelineTask).where(
+                and_(
+                    PipelineTask.document_id == document_id,
+                    PipelineTask.step == next_step
                 )
-                existing = result.scalar_one_or_none()
-                
-                if not existing:
-                    next_task = PipelineTask(
-                        document_id=document_id,
-                        step=next_step,
-                        status=TaskStatus.PENDING
-                    )
-                    self.db.add(next_task)
-        except ValueError:
-            pass
+            )
+        )
+        existing = result.scalar_one_or_none()
+        
+        if not existing:
+            next_task = PipelineTask(
+                document_id=document_id,
+                step=next_step,
+                status=TaskStatus.PENDING
+            )
+            self.db.add(next_task)
@@ -0,0 +1,7 @@
+"""
+Pytest configuration - puts backend/ on sys.path so tests can import app
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
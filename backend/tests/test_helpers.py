@@ -0,0 +1,48 @@
+"""
+Tests for app.utils.helpers
+"""
+import hashlib
+import os
+
+from app.utils.helpers import calculate_file_hash
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_file_hash_matches_content(tmp_path):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"judgment text")
+    assert calculate_file_hash(str(path)) == _sha256(b"judgment text")
+
+
+def test_file_hash_after_replace_with_same_size_and_mtime(tmp_path):
+    # rsync -t / mv: new content of the same size renamed over the file, old mtime kept
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"original")
+    stat = os.stat(path)
+    assert calculate_file_hash(str(path)) == _sha256(b"original")
+
+    replacement = tmp_path / "doc.pdf.tmp"
+    replacement.write_bytes(b"replaced")
+    os.utime(replacement, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(replacement, path)
+
+    assert os.stat(path).st_mtime_ns == stat.st_mtime_ns
+    assert calculate_file_hash(str(path)) == _sha256(b"replaced")
+
+
+def test_file_hash_after_in_place_rewrite_with_same_size(tmp_path):
+    # Same inode rewritten; the timestamp is set explicitly so the test
+    # doesn't depend on the filesystem's timestamp granularity
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"original")
+    stat = os.stat(path)
+    assert calculate_file_hash(str(path)) == _sha256(b"original")
+
+    path.write_bytes(b"replaced")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert os.stat(path).st_ino == stat.st_ino
+    assert calculate_file_hash(str(path)) == _sha256(b"replaced")